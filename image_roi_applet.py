@@ -6,6 +6,9 @@
 # - single top-row toolbar: [Autoscale] [Auto once]  <x,y,val>
 # - autoscale uses min/max; histogram bounds stay in sync
 
+import functools
+import os
+
 import numpy as np
 
 import PyQt5  # ensure pyqtgraph binds to Qt6
@@ -15,9 +18,71 @@ from PyQt5 import QtWidgets, QtCore, QtGui
 import pyqtgraph as pg
 from artiq.applets.simple import SimpleApplet
 
-pg.setConfigOptions(imageAxisOrder='row-major')  # width = n_x, height = n_y
-
-
+try:
+    import bottleneck as bn  # optional: faster NaN-aware reductions
+except ImportError:
+    bn = None
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+try:
+    from superqt.utils import qthrottled  # optional: coalesce bursty dataset mods
+except ImportError:
+    qthrottled = None
+
+# Minimum interval between redraws from data_changed (~30 Hz)
+_REDRAW_THROTTLE_MS = 33
+
+# Frames smaller than this stay on NumPy/bottleneck; JIT dispatch isn't worth it
+_MINMAX_JIT_MIN_SIZE = 1 << 16
+
+# Autoscale uint8/uint16 frames to (0, dtype max) without scanning them
+AUTOSCALE_FULL_RANGE = False
+
+if njit is not None:
+    # Only used by the Autoscale toggle / "Auto once" (per-frame autoscale is
+    # setImage(autoLevels=...)), so it compiles lazily on the first click
+    # rather than at applet start.
+    # No fastmath here: it assumes no NaNs and would drop the v == v test
+    @njit(parallel=True, cache=True)
+    def _minmax_nan(a):
+        """NaN-ignoring (min, max) in one sweep; (inf, -inf) if all NaN."""
+        flat = a.ravel()
+        lo = np.inf
+        hi = -np.inf
+        for i in prange(flat.size):
+            v = flat[i]
+            if v == v:
+                lo = min(lo, v)
+                hi = max(hi, v)
+        return lo, hi
+else:
+    _minmax_nan = None
+
+pg.setConfigOptions(
+    imageAxisOrder='row-major',   # width = n_x, height = n_y
+    useNumba=njit is not None,    # numba fastpath for level rescaling in ImageItem
+)
+
+# Opt-in GPU rendering path: frames are handed to ImageItem as CuPy arrays
+cp = None
+if os.environ.get("DNAMIC_APPLET_CUPY"):
+    try:
+        import cupy as cp
+        pg.setConfigOptions(useCupy=True)
+    except ImportError:
+        cp = None
+
+
+# Shared pens for ROI outlines (mkPen copies them into each ROI)
+_ROI_PEN = pg.mkPen((255, 255, 255, 220), width=2)
+_ROI_HOVER_PEN = pg.mkPen((0, 200, 255, 220), width=3)
+
+
+@functools.lru_cache(maxsize=8)
 def _simple_colormap(name="magma", stops=6) -> pg.ColorMap:
     base = pg.colormap.get(name)  # modern API
     lut = base.getLookupTable(0.0, 1.0, stops)    # (stops x 3 or x4) uint8
@@ -46,11 +111,18 @@ class ImageWithROIs(pg.ImageView):
         self._cmap = _simple_colormap("magma", stops=6)
         self.setColorMap(self._cmap)   # updates both image & histogram
 
+        # Downsample large frames to the viewport resolution before rendering
+        self.getImageItem().setAutoDownsample(True)
+
         # State
         self._img_np = None
+        self._n_y, self._n_x = 0, 0
+        self._last_xy = None        # last pixel shown in the readout
+        self._image_dirty = True    # image dataset modified since last setImage
         self._autoscale = True
         self._roi_items = []        # list[list[pg.RectROI]]
         self._roi_labels = []       # list[list[pg.TextItem]]
+        self._roi_geom_buf = np.empty((0, 0, 4))  # (x, y, w, h) per ROI, reused
         self._internal_update = False  # guard to avoid feedback loops
 
         # ---- Single top-row toolbar overlay: [Autoscale] [Auto once]  position ----
@@ -84,9 +156,15 @@ class ImageWithROIs(pg.ImageView):
         self._chk_autoscale.toggled.connect(self._on_autoscale_toggled)
         self._btn_auto_once.clicked.connect(self._apply_auto_levels_once)
 
+        # Redraw throttle: leading + trailing, so the last update is always drawn
+        if qthrottled is not None:
+            self._do_update = qthrottled(self._do_update_impl, timeout=_REDRAW_THROTTLE_MS)
+        else:
+            self._do_update = self._do_update_impl
+
         # Mouse move hook (throttled)
         self._mouse_proxy = pg.SignalProxy(
-            self.getView().scene().sigMouseMoved, rateLimit=60, slot=self._on_mouse_moved
+            self.getView().scene().sigMouseMoved, rateLimit=30, slot=self._on_mouse_moved
         )
 
         # Keep toolbar pinned at top-left on viewport resize
@@ -104,7 +182,24 @@ class ImageWithROIs(pg.ImageView):
     
 
     # ----- level helpers (sync image + histogram) ----------------------------
+    def _levels_match(self, lo: float, hi: float) -> bool:
+        # Compare against what's actually applied (the user may have dragged the
+        # histogram since we last set anything), reading without firing signals
+        cur = self.getImageItem().getLevels()
+        if cur is None or not np.array_equal(cur, (lo, hi)):
+            return False
+        hist = getattr(self.ui, "histogram", None)
+        if hist is None:
+            return True
+        try:
+            return tuple(hist.getLevels()) == (lo, hi)
+        except Exception:
+            return False
+
     def _set_levels(self, lo: float, hi: float) -> None:
+        # Stable autoscale results are common; skip the redundant signal cascade
+        if self._levels_match(lo, hi):
+            return
         self.getImageItem().setLevels((lo, hi))
         if getattr(self.ui, "histogram", None) is not None:
             try:
@@ -116,8 +211,25 @@ class ImageWithROIs(pg.ImageView):
     def _apply_levels_minmax(self, arr) -> bool:
         if arr is None:
             return False
-        lo = float(np.nanmin(arr))
-        hi = float(np.nanmax(arr))
+        is_int = np.issubdtype(arr.dtype, np.integer)
+        if is_int and AUTOSCALE_FULL_RANGE and arr.dtype.type in (np.uint8, np.uint16):
+            # Camera-style frames: show the full sensor range, no scan needed
+            lo, hi = 0.0, float(np.iinfo(arr.dtype).max)
+        elif _minmax_nan is not None and arr.size > _MINMAX_JIT_MIN_SIZE:
+            # One fused pass (the NaN test is a no-op for integer frames)
+            lo, hi = _minmax_nan(arr)
+            lo, hi = float(lo), float(hi)
+        elif is_int:
+            # Integer frames can't hold NaN; skip the isnan codepath entirely
+            lo, hi = float(arr.min()), float(arr.max())
+        elif bn is not None:
+            lo, hi = float(bn.nanmin(arr)), float(bn.nanmax(arr))
+        else:
+            lo, hi = float(np.nanmin(arr)), float(np.nanmax(arr))
+        if is_int and lo == hi:
+            # Constant integer frame: open the window by one count instead of
+            # refusing to autoscale (which leaves stale levels on screen)
+            hi = lo + 1.0
         if not np.isfinite(lo) or not np.isfinite(hi) or lo == hi:
             return False
         self._set_levels(lo, hi)
@@ -146,6 +258,42 @@ class ImageWithROIs(pg.ImageView):
         self._roi_items = []
         self._roi_labels = []
 
+    def _make_roi_item(self, gi, roi_i, pos, size):
+        """Create one interactive RectROI (plus its label) and add it to the view."""
+        r = pg.RectROI(
+            pos, size,
+            sideScalers=False,
+            rotatable=False,
+            scaleSnap=True, translateSnap=True, snapSize=1.0,
+            pen=_ROI_PEN,
+            hoverPen=_ROI_HOVER_PEN,
+        )
+        r.setZValue(10)
+        # When the user finishes moving/resizing, snap + push dataset
+        r.sigRegionChangeFinished.connect(self._on_roi_finished)
+        self.getView().addItem(r)
+
+        label_text = f"({gi},{roi_i})"
+        # --- does not scale with zoom ---
+        # lbl = pg.TextItem(
+        #     text=label_text,
+        #     anchor=(0, 0),                       
+        #     fill=pg.mkColor(0, 0, 0, 140)       
+        # )
+    
+        # --- scales with zoom ---
+        lbl = QtWidgets.QGraphicsSimpleTextItem(label_text)
+        font = QtGui.QFont()
+        font.setPointSizeF(1)
+        font.setWeight(QtGui.QFont.Weight.DemiBold)
+        lbl.setFont(font)
+        lbl.setBrush(QtGui.QBrush(QtGui.QColor(255, 255, 255)))
+        
+        lbl.setParentItem(r)                     
+        lbl.setPos(0, 0)     
+        lbl.setZValue(11)
+        return r, lbl
+
     def _ensure_roi_items(self, rois):
         """Create or update interactive RectROIs to match list of (y0,y1,x0,x1)."""
         if rois is None:
@@ -158,62 +306,56 @@ class ImageWithROIs(pg.ImageView):
 
         vb = self.getView()
 
-        # Build from scratch if list length changed
-        rebuild = (len(self._roi_items) != len(rois))
-        if rebuild:
-            self._clear_roi_items()
-            for gi, roi_g in enumerate(rois):
-                self._roi_items.append([])
-                self._roi_labels.append([])
-                for roi_i, (y0, y1, x0, x1) in enumerate(roi_g):
-                    pos  = pg.Point(float(x0), float(y0))
-                    size = pg.Point(float(x1 - x0), float(y1 - y0))
-                    r = pg.RectROI(
-                        pos, size,
-                        sideScalers=False,
-                        rotatable=False,
-                        scaleSnap=True, translateSnap=True, snapSize=1.0,
-                        pen=pg.mkPen((255, 255, 255, 220), width=2),
-                        hoverPen=pg.mkPen((0, 200, 255, 220), width=3),
-                    )
-                    r.setZValue(10)
-                    # When the user finishes moving/resizing, snap + push dataset
-                    r.sigRegionChangeFinished.connect(self._on_roi_finished)
-                    vb.addItem(r)
-                    self._roi_items[gi].append(r)
-
-                    label_text = f"({gi},{roi_i})"
-                    # --- does not scale with zoom ---
-                    # lbl = pg.TextItem(
-                    #     text=label_text,
-                    #     anchor=(0, 0),                       
-                    #     fill=pg.mkColor(0, 0, 0, 140)       
-                    # )
-                
-                    # --- scales with zoom ---
-                    lbl = QtWidgets.QGraphicsSimpleTextItem(label_text)
-                    font = QtGui.QFont()
-                    font.setPointSizeF(1)
-                    font.setWeight(QtGui.QFont.Weight.DemiBold)
-                    lbl.setFont(font)
-                    lbl.setBrush(QtGui.QBrush(QtGui.QColor(255, 255, 255)))
-                    
-                    lbl.setParentItem(r)                     
-                    lbl.setPos(0, 0)     
-                    lbl.setZValue(11)
-                    self._roi_labels[gi].append(lbl)
-        else:
-            # Update positions/sizes without re-creating
-            self._internal_update = True
-            try:
-                for gi, roi_g in enumerate(rois):
-                    for roi_i, (y0, y1, x0, x1) in enumerate(roi_g):
-                        r = self._roi_items[gi][roi_i]
-                        # setPos/setSize with finish=False to avoid extra signals
-                        r.setPos(pg.Point(float(x0), float(y0)), finish=False)
-                        r.setSize(pg.Point(float(x1 - x0), float(y1 - y0)), finish=False)
-            finally:
-                self._internal_update = False
+        # (x, y, w, h) for every ROI in one vectorized pass, written into a
+        # buffer reused across updates; tolist() hands back plain Python floats
+        # so the loop below doesn't box NumPy scalars
+        g = self._roi_geom_buf
+        if g.shape != rois.shape:
+            g = self._roi_geom_buf = np.empty(rois.shape, dtype=np.float64)
+        g[..., 0] = rois[..., 2]
+        g[..., 1] = rois[..., 0]
+        np.subtract(rois[..., 3], rois[..., 2], out=g[..., 2])
+        np.subtract(rois[..., 1], rois[..., 0], out=g[..., 3])
+        geom = g.tolist()
+
+        # Keep the existing items as a pool: only add/remove the difference when
+        # the layout changes, and only touch geometry that actually moved.
+        # (The label of a ROI is its child, so it goes with it.)
+        while len(self._roi_items) > len(rois):
+            for it in self._roi_items.pop():
+                vb.removeItem(it)
+            self._roi_labels.pop()
+
+        self._internal_update = True
+        try:
+            for gi, geom_g in enumerate(geom):
+                if gi == len(self._roi_items):
+                    self._roi_items.append([])
+                    self._roi_labels.append([])
+                items = self._roi_items[gi]
+                labels = self._roi_labels[gi]
+
+                while len(items) > len(geom_g):
+                    vb.removeItem(items.pop())
+                    labels.pop()
+
+                for roi_i, (x, y, w, h) in enumerate(geom_g):
+                    pos  = pg.Point(x, y)
+                    size = pg.Point(w, h)
+                    if roi_i == len(items):
+                        r, lbl = self._make_roi_item(gi, roi_i, pos, size)
+                        items.append(r)
+                        labels.append(lbl)
+                        continue
+
+                    r = items[roi_i]
+                    # setPos/setSize with finish=False to avoid extra signals
+                    if r.pos() != pos:
+                        r.setPos(pos, finish=False)
+                    if r.size() != size:
+                        r.setSize(size, finish=False)
+        finally:
+            self._internal_update = False
 
     def _on_roi_finished(self, *args):
         """Snap ROI to integer grid, clamp to image, and write back dataset."""
@@ -264,14 +406,14 @@ class ImageWithROIs(pg.ImageView):
     def _on_mouse_moved(self, evt):
         # Check we have an image
         if self._img_np is None:
-            self._pos_label.setText("")
+            self._clear_readout()
             return
         
         # Check our mouse is in the scene
         pos = evt[0]
         vb = self.getView()
         if not vb.sceneBoundingRect().contains(pos):
-            self._pos_label.setText("")
+            self._clear_readout()
             return
         
         # Map to image pixel
@@ -280,33 +422,71 @@ class ImageWithROIs(pg.ImageView):
         y = int(np.floor(p.y()))
         
         # If in the image, show position & value
-        n_y, n_x = self._img_np.shape[:2]
-        if 0 <= x < n_x and 0 <= y < n_y:
-            val = self._img_np[y, x]
+        if 0 <= x < self._n_x and 0 <= y < self._n_y:
+            # Same pixel as last time -> label is already right
+            if (x, y) == self._last_xy:
+                return
+            self._last_xy = (x, y)
+            img = self._img_np
+            val = img.item(y, x) if img.ndim == 2 else img[y, x]
             self._pos_label.setText(f"x={x}, y={y}, val={val}")
         else:
-            self._pos_label.setText("")
+            self._clear_readout()
+
+    def _clear_readout(self):
+        self._last_xy = None
+        self._pos_label.setText("")
 
     # ----- ARTIQ hook --------------------------------------------------------
+    @staticmethod
+    def _mods_touch(mods, key) -> bool:
+        """True if any dataset mod in `mods` (ARTIQ sync_struct format) affects `key`."""
+        for mod in mods:
+            if mod.get("action") == "init":
+                return True
+            path = mod.get("path")
+            name = path[0] if path else mod.get("key")
+            if name == key:
+                return True
+        return False
+
     def data_changed(self, value, metadata, persist, mods):
-        # Update the image only when it actually changes
         img = value.get(self.args.image)
-        if img is not None:
-            arr = np.array(img)
+        rois_name = getattr(self.args, "rois", None)
+        rois = value.get(rois_name)   if rois_name   else None
+        # Accumulate here rather than in the (throttled) update, so an image mod
+        # coalesced away by the throttle still gets drawn by the trailing call
+        if self._mods_touch(mods, self.args.image):
+            self._image_dirty = True
+        self._do_update(img, rois)
+
+    def _do_update_impl(self, img, rois):
+        # Update the image only when it actually changes
+        if img is not None and self._image_dirty:
+            self._image_dirty = False
             first_frame = self._img_np is None
 
-            self._img_np = arr
+            # Keep our own copy (the dataset can be modified in place), but
+            # reuse the buffer from the previous frame when the layout matches
+            src = np.asarray(img)
+            arr = self._img_np
+            if arr is None or arr.shape != src.shape or arr.dtype != src.dtype:
+                arr = np.array(src)
+            else:
+                np.copyto(arr, src)
+
+            self._img_np = arr  # host copy for levels / mouse readout / ROI clamping
+            self._n_y, self._n_x = arr.shape[:2]
+            self._last_xy = None  # pixel values changed; refresh readout on next move
 
             self.setImage(
-                arr,
+                cp.asarray(arr) if cp is not None else arr,
                 autoRange=False,
                 autoLevels=self._autoscale,
                 autoHistogramRange=first_frame, # Allow autoHistogramRange on the very first frame so the image appears; after that, keep the range.
             )
 
         # ROIs — this does NOT touch the image/zoom
-        rois_name = getattr(self.args, "rois", None)
-        rois = value.get(rois_name)   if rois_name   else None
         self._ensure_roi_items(rois)
 
 
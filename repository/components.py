@@ -4,10 +4,41 @@ from ndscan.experiment import (
     IntChannel,
     MHz, us, ms, OpaqueChannel
 )
-import random, numpy as np
+import math, os, random, numpy as np
 import time
 from repository.models.atom_response import image_from_probs_and_locs
 
+# Minimum time between "last_image" broadcasts (s), ~15 Hz
+LAST_IMAGE_BROADCAST_INTERVAL = 1/15
+
+# Opt-in GPU path for ROI integration (only pays off for large frames / many ROIs)
+cp = None
+if os.environ.get("DNAMIC_GPU"):
+    try:
+        import cupy as cp
+    except ImportError:
+        cp = None
+
+
+def _roi_sums(image, rois, xp=np):
+    """Sum `image` over each (y0,y1,x0,x1) in `rois` (shape (..., 4)) via a summed-area table.
+
+    `xp` is the array module (numpy or cupy) that `image` lives in.
+    """
+    n_y, n_x = image.shape
+    # Zero-padded integral image: I[y, x] = image[:y, :x].sum()
+    I = xp.zeros((n_y + 1, n_x + 1), dtype=xp.int64)
+    I[1:, 1:] = xp.cumsum(xp.cumsum(image, axis=0, dtype=xp.int64), axis=1)
+
+    # Clip like slicing would, so image[y0:y1, x0:x1] semantics are kept
+    y0, y1, x0, x1 = xp.moveaxis(xp.asarray(rois, dtype=xp.intp), -1, 0)
+    y0 = xp.clip(y0, 0, n_y)
+    y1 = xp.clip(y1, y0, n_y)
+    x0 = xp.clip(x0, 0, n_x)
+    x1 = xp.clip(x1, x0, n_x)
+    return I[y1, x1] - I[y0, x1] - I[y1, x0] + I[y0, x0]
+
+
 class PrepareAtom(ExpFragment):
     def build_fragment(self):
         self.setattr_param("cool_time", FloatParam, "Cooling time", default=2.0*ms, min=0.0, unit="ms")
@@ -15,7 +46,7 @@ class PrepareAtom(ExpFragment):
     def run_once(self):
         ct = self.cool_time.get()
         time.sleep(ct)
-        print(f"[Prepare] {self.cool_time.get()/ms:.1f} ms → prepared")
+        print(f"[Prepare] {ct/ms:.1f} ms → prepared")
 
 class Pulse(ExpFragment):
     def build_fragment(self):
@@ -33,28 +64,57 @@ class ReadoutFluorescence(ExpFragment):
         self.setattr_result("counts",          OpaqueChannel)
         # self.setattr_result("is_bright_class", OpaqueChannel)
 
+        # ROIs as an (groups, rois, 4) int array; fetched once per scan
+        self._rois_cache = None
+        self._last_broadcast_t = -math.inf
+        # Newest image held back by the rate limit; sent when the scan ends
+        self._pending_image = None
+        self._rng = np.random.default_rng()
+
+    def host_setup(self):
+        # Pick up any ROI edits made since the last scan
+        self._rois_cache = None
+        super().host_setup()
+
+    def host_cleanup(self):
+        # Make sure the applet ends up showing the scan's last shot
+        if self._pending_image is not None:
+            self._broadcast_image(self._pending_image)
+        super().host_cleanup()
+
+    def _broadcast_image(self, image):
+        # Live view only; an archived copy would just be whichever frame got past the limit
+        self.set_dataset("last_image", image, broadcast=True, archive=False)
+        self._last_broadcast_t = time.monotonic()
+        self._pending_image = None
+
+    def _get_rois(self):
+        if self._rois_cache is None:
+            try:
+                rois = self.get_dataset("rois",archive=False)
+            except KeyError:
+                # sensible default
+                rois = [[(15, 18, 5, 8), (15, 18, 11, 14), (15, 18, 17, 20), (15, 18, 23, 26), (15, 18, 29, 32), (15, 18, 35, 38), (15, 18, 41, 44), (15, 18, 47, 50)]]
+                self.set_dataset("rois", rois, broadcast=True)
+            self._rois_cache = np.asarray(rois, dtype=np.int32)
+        return self._rois_cache
+
     def run_once(self):
         pb  = self.p_bright.get()
         # thr = self.threshold.get()
 
-        image = image_from_probs_and_locs([(6+6*i,16,pb) for i in range(8)])
-        self.set_dataset("last_image",image,broadcast=True)
-
-        try:
-            rois = self.get_dataset("rois",archive=False)
-        except KeyError:
-            # sensible default
-            rois = [(15, 18, 5, 8), (15, 18, 11, 14), (15, 18, 17, 20), (15, 18, 23, 26), (15, 18, 29, 32), (15, 18, 35, 38), (15, 18, 41, 44), (15, 18, 47, 50)]
-            self.set_dataset("rois", rois, broadcast=True)
+        image = image_from_probs_and_locs([(6+6*i,16,pb) for i in range(8)], rng=self._rng)
+        # The image is only for live viewing; cap the broadcast rate
+        if time.monotonic() - self._last_broadcast_t > LAST_IMAGE_BROADCAST_INTERVAL:
+            self._broadcast_image(image)
+        else:
+            self._pending_image = image
 
-        rois_shape = np.shape(rois)
-        
-        # Sum counts in each ROI and classify
-        counts = np.empty((rois_shape[0],rois_shape[1]), dtype=np.int16)
-        for g_i, roi_g in enumerate(rois):
-            for roi_i, (y0,y1,x0,x1) in enumerate(roi_g):
-                cts = int(image[y0:y1, x0:x1].sum())
-                counts[g_i,roi_i] = cts
+        # Sum counts in each ROI (groups x rois)
+        if cp is not None:
+            counts = cp.asnumpy(_roi_sums(cp.asarray(image), self._get_rois(), xp=cp)).astype(np.int16)
+        else:
+            counts = _roi_sums(image, self._get_rois()).astype(np.int16)
         
         self.counts.push(counts)
 
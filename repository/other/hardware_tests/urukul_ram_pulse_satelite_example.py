@@ -22,18 +22,14 @@ class UrukulToneRAMExample(EnvExperiment):
 
         a0, a1, a2, a3 = 0.35875, 0.48829, 0.14128, 0.01168
         
-        twopi = 2*np.pi
-        bh = []
-        for n in range(self.bh_steps):
-            x = n/(self.bh_steps-1)
-            w = a0 - a1*np.cos(twopi*x) + a2*np.cos(2*twopi*x) - a3*np.cos(3*twopi*x)
-            bh.append(w)
+        t = 2*np.pi*np.arange(self.bh_steps)/(self.bh_steps-1)
+        bh = a0 - a1*np.cos(t) + a2*np.cos(2*t) - a3*np.cos(3*t)
         # scale
-        peak = max(bh)
+        peak = bh.max()
         if peak > 0:
-            bh = [0.6*v/peak for v in bh]
+            bh *= 0.6/peak
 
-        self.amp_logical += bh
+        self.amp_logical += bh.tolist()
 
         #               7    6    5    4    3    2    1    0     indices when writing ram profiles set_profile_ram
         # self.amp = [0.0, 0.0, 0.1, 0.7, 0.1, 0.5, 0.5, 0.0]    this will be played in right-to-left order if sent like this
@@ -3,10 +3,16 @@ from ndscan.experiment import (
     IntParam, LinearGenerator, ScanOptions,
     CustomAnalysis, FloatChannel, make_fragment_scan_exp, IntChannel
 )
+import logging
 import math
 import numpy as np
 from repository.reusable.stats import jeffreys_median_ci, moment_matched_beta_for_average, beta_quartiles, pooled_posterior_beta
 
+logger = logging.getLogger(__name__)
+
+# Result suffixes pushed for every G{gi}R{roi_i} cell, in column order
+_CELL_SUFFIXES = ("p", "p_upper_err", "p_lower_err", "p_avg_err", "n", "y")
+
 def make_shot_indexed_carrier(ShotCls):
     """Return a concrete carrier class wrapping `ShotCls` and owning `shot_index` + analysis."""
     class ShotCarrier(ExpFragment):
@@ -22,6 +28,11 @@ def make_shot_indexed_carrier(ShotCls):
         def get_default_analyses(self):
             rois = self.get_dataset("rois")
 
+            # Channel key prefixes, kept for the analysis so it doesn't rebuild
+            # them: per-cell in (gi, roi_i) row-major order, and per-ROI averages
+            self._cell_keys = [f"G{gi}R{roi_i}" for gi in range(len(rois)) for roi_i in range(len(rois[0]))]
+            self._avg_keys = [f"GaR{roi_i}" for roi_i in range(len(rois[0]))]
+
             channels = []
             for roi_i in range(len(rois[0])):
                 pre_key_avg = f"GaR{roi_i}"
@@ -51,36 +62,40 @@ def make_shot_indexed_carrier(ShotCls):
             classes_handle = self.shot.get_counts_handle()
             counts = np.asarray(result_values[classes_handle])
             threshold = self.get_dataset("threshold",default=2000)
-            rois = self.get_dataset("rois")
-            
-            n=np.sum(np.ones_like(counts),axis=0)
-            y=np.sum(counts>threshold,axis=0)
+
+            y=np.count_nonzero(counts>threshold,axis=0)
+            # Every cell saw every shot: n is just the shot count, per cell
+            n=np.full(y.shape, counts.shape[0])
 
             med,low,high = jeffreys_median_ci(y, n)
             rel_upper_err = high-med
             rel_low_err = med-low
             rel_avg_err=(high-low)/2
-            
-            for roi_i in range(len(rois[0])):
-                pre_key_avg = f"GaR{roi_i}"
-                for gi in range(len(rois)):
-                    pre_key = f"G{gi}R{roi_i}"
-                    analysis_results[f"{pre_key}_p"].push(med[gi,roi_i])
-                    analysis_results[f"{pre_key}_p_upper_err"].push(rel_upper_err[gi,roi_i])
-                    analysis_results[f"{pre_key}_p_lower_err"].push(rel_low_err[gi,roi_i])
-                    analysis_results[f"{pre_key}_p_avg_err"].push(rel_avg_err[gi,roi_i])
-                    analysis_results[f"{pre_key}_n"].push(n[gi,roi_i])
-                    analysis_results[f"{pre_key}_y"].push(y[gi,roi_i])
-                a_star, b_star= pooled_posterior_beta(y[:,roi_i],n[:,roi_i])#, drift_aware=True)
-                lower_all,med_all,upper_all = beta_quartiles(a_star, b_star)
-                print(lower_all,med_all,upper_all)
-                rel_lower_all = med_all-lower_all
-                rel_upper_all = upper_all - med_all
-                rel_avg_all = (upper_all-lower_all)/2
-                analysis_results[f"{pre_key_avg}_p"].push(med_all)
-                analysis_results[f"{pre_key_avg}_p_upper_err"].push(rel_upper_all)
-                analysis_results[f"{pre_key_avg}_p_lower_err"].push(rel_lower_all)
-                analysis_results[f"{pre_key_avg}_p_avg_err"].push(rel_avg_all)
+
+            # Per-(group, ROI) results: flatten each array to Python scalars once
+            # and push through a table of bound push methods in the same order
+            pushers = [
+                tuple(analysis_results[f"{pre_key}_{suffix}"].push for suffix in _CELL_SUFFIXES)
+                for pre_key in self._cell_keys
+            ]
+            columns = [c.ravel().tolist() for c in (med, rel_upper_err, rel_low_err, rel_avg_err, n, y)]
+            for cell_pushers, cell_values in zip(pushers, zip(*columns)):
+                for push, v in zip(cell_pushers, cell_values):
+                    push(v)
+
+            # Pooled (constant-p) posterior per ROI across groups, all ROIs at once
+            a_star, b_star = pooled_posterior_beta(y, n, axis=0)#, drift_aware=True)
+            lower_all, med_all, upper_all = beta_quartiles(a_star, b_star)
+            rel_lower_all = med_all-lower_all
+            rel_upper_all = upper_all - med_all
+            rel_avg_all = (upper_all-lower_all)/2
+            logger.debug("pooled lo=%s med=%s hi=%s", lower_all, med_all, upper_all)
+            avg_columns = [c.tolist() for c in (med_all, rel_upper_all, rel_lower_all, rel_avg_all)]
+            for pre_key_avg, (med_v, rel_up, rel_lo, rel_avg) in zip(self._avg_keys, zip(*avg_columns)):
+                analysis_results[f"{pre_key_avg}_p"].push(med_v)
+                analysis_results[f"{pre_key_avg}_p_upper_err"].push(rel_up)
+                analysis_results[f"{pre_key_avg}_p_lower_err"].push(rel_lo)
+                analysis_results[f"{pre_key_avg}_p_avg_err"].push(rel_avg)
                 # analysis_results[f"{pre_key_avg}_n"].push(n[gi,roi_i])
                 # analysis_results[f"{pre_key_avg}_y"].push(y[gi,roi_i])
 
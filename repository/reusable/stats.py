@@ -3,6 +3,11 @@ from scipy.special import betaincinv, betaln
 import matplotlib.pyplot as plt
 from math import erf, sqrt
 
+try:
+    import numba
+except ImportError:
+    numba = None
+
 def jeffreys_median_ci(y, n, level=0.6827):
     """
     Jeffreys posterior for binomial: p | y,n ~ Beta(y+0.5, n-y+0.5)
@@ -25,13 +30,12 @@ def jeffreys_median_ci(y, n, level=0.6827):
     a = y + 0.5
     b = n - y + 0.5
 
-    # median (q=0.5)
-    median = betaincinv(a, b, 0.5)
-
-    # equal-tailed interval
+    # median (q=0.5) and equal-tailed interval, in one broadcast call over a
+    # trailing quantile axis
     alpha = 1.0 - float(level)
-    lo = betaincinv(a, b, alpha/2.0)
-    hi = betaincinv(a, b, 1.0 - alpha/2.0)
+    q = np.array([0.5, alpha/2.0, 1.0 - alpha/2.0])
+    res = betaincinv(a[..., None], b[..., None], q)
+    median, lo, hi = res[..., 0], res[..., 1], res[..., 2]
 
     return median, lo, hi
 
@@ -47,6 +51,13 @@ def moment_matched_beta_for_average(y, n, w=None, prior=(0.5, 0.5), drift_aware=
     y = np.asarray(y, float)
     n = np.asarray(n, float)
     a0, b0 = prior
+    if _moment_matched_beta_jit is not None:
+        w = 1.0 if w is None else np.asarray(w, float)
+        # The kernel indexes y, n and w by the same i with no bounds checks,
+        # so scalars (e.g. one n for every run) must be expanded first
+        y, n, w = np.broadcast_arrays(y, n, w)
+        return _moment_matched_beta_jit(y.ravel(), n.ravel(), w.ravel(), float(a0), float(b0), bool(drift_aware))
+
     a = y + a0
     b = n - y + b0
 
@@ -73,16 +84,66 @@ def moment_matched_beta_for_average(y, n, w=None, prior=(0.5, 0.5), drift_aware=
     beta_star  = (1 - m) * kappa
     return alpha_star, beta_star, m, v
 
-def pooled_posterior_beta(y, n, prior=(0.5, 0.5)):
-    """Constant-p assumption: pool counts, apply Jeffreys (or given) prior once."""
+def _moment_matched_beta_kernel(y, n, w, a0, b0, drift_aware):
+    """Scalar-loop body of moment_matched_beta_for_average (no temporaries); for numba."""
+    r = y.size
+    w_sum = 0.0
+    for i in range(r):
+        w_sum += w[i]
+
+    m = 0.0
+    v_within = 0.0
+    for i in range(r):
+        a = y[i] + a0
+        s = n[i] + a0 + b0
+        mu = a / s
+        var = a * (s - a) / (s * s * (s + 1.0))
+        wi = w[i] / w_sum
+        m += wi * mu
+        v_within += wi * wi * var
+
+    v_between = 0.0
+    if drift_aware:
+        for i in range(r):
+            mu = (y[i] + a0) / (n[i] + a0 + b0)
+            v_between += (w[i] / w_sum) * (mu - m)**2
+    v = v_within + v_between
+
+    # Guard rails (same as np.clip, including lo > hi -> hi)
+    m = min(max(m, 1e-12), 1 - 1e-12)
+    v = min(max(v, 1e-18), m*(1-m) - 1e-18)
+
+    kappa = m*(1-m)/v - 1.0
+    return m * kappa, (1 - m) * kappa, m, v
+
+if numba is not None:
+    _moment_matched_beta_jit = numba.njit(cache=True, fastmath=True)(_moment_matched_beta_kernel)
+else:
+    _moment_matched_beta_jit = None
+
+def pooled_posterior_beta(y, n, prior=(0.5, 0.5), axis=None):
+    """Constant-p assumption: pool counts, apply Jeffreys (or given) prior once.
+
+    With `axis`, pools along that axis only and returns arrays, e.g. one
+    posterior per ROI from (groups, rois) counts with axis=0.
+    """
     a0, b0 = prior
-    return a0 + float(np.sum(y)), b0 + float(np.sum(n - y))
+    # sum(n - y) as sum(n) - sum(y): two reductions, no n-shaped temporary
+    y_sum = np.sum(y, axis=axis)
+    n_sum = np.sum(n, axis=axis)
+    if axis is None:
+        return a0 + float(y_sum), b0 + float(n_sum) - float(y_sum)
+    return a0 + y_sum, b0 + (n_sum - y_sum)
+
 
+_QUARTILES = np.array([0.25, 0.50, 0.75])
 
 def beta_quartiles(a,b):
-    return (float(betaincinv(a,b,0.25)),
-            float(betaincinv(a,b,0.50)),
-            float(betaincinv(a,b,0.75)))
+    """(25%, 50%, 75%) points of Beta(a, b): floats for scalar a, b, else arrays."""
+    res = betaincinv(np.asarray(a, float)[..., None], np.asarray(b, float)[..., None], _QUARTILES)
+    if res.ndim == 1:
+        return tuple(float(v) for v in res)
+    return res[..., 0], res[..., 1], res[..., 2]
 
 # ---------- main plotting demo ----------
 
@@ -107,11 +168,14 @@ def plot_combined_posteriors(
         return dens
     
     def beta_pdf_on_grid(a, b, grid):
-        """Stable Beta density on a grid via log-space normalization."""
+        """Stable Beta density on a grid via log-space normalization.
+        a, b may be length-r arrays -> (r, len(grid)), one row per pair."""
+        a = np.asarray(a, float)[..., None]
+        b = np.asarray(b, float)[..., None]
         logpdf = (a - 1.0)*np.log(grid) + (b - 1.0)*np.log1p(-grid) - (betaln(a, b))
-        logpdf -= np.max(logpdf)  # for numerical stability
+        logpdf -= np.max(logpdf, axis=-1, keepdims=True)  # for numerical stability
         f = np.exp(logpdf)
-        f /= np.trapezoid(f, grid)
+        f /= np.trapezoid(f, grid, axis=-1)[..., None]
         return f
 
     rng = np.random.default_rng(seed)
@@ -140,8 +204,8 @@ def plot_combined_posteriors(
     # Grid
     p = np.linspace(1e-6, 1 - 1e-6, 14000)
 
-    # Per-run densities (for lower plot)
-    per_run = [beta_pdf_on_grid(ai, bi, p) for ai, bi in zip(a_i, b_i)]
+    # Per-run densities (for lower plot), one row per run
+    per_run = beta_pdf_on_grid(a_i, b_i, p)
 
     # ---------- Combined distributions ----------
     # (1) Constant-p: pooled counts -> Beta
@@ -161,7 +225,7 @@ def plot_combined_posteriors(
     f_avg_d = beta_pdf_on_grid(a_d, b_d, p)
 
     # (3b) Weighted average WITH drift — exact mixture of Betas
-    f_avg_d_unmatched = np.sum((w[:, None] * np.vstack(per_run)), axis=0)
+    f_avg_d_unmatched = np.sum((w[:, None] * per_run), axis=0)
 
     # True latent density (for reference)
     f_true = truncated_normal_pdf(p, mu_true, sd_true)
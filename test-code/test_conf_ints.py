@@ -3,117 +3,571 @@ Jeffreys binomial credible intervals — accuracy & speed benchmark.
 
 Implementations:
   - ours_scipy: SciPy betaincinv (vectorized, compiled)
-  - ours_mpmath: pure-Python mpmath.betaincinv fallback
+  - ours_scipy_sorted: the same, with queries sorted by min(a, b) first
+  - ours_asymptotic: Temme's large-(a+b) inversion + one Halley step, SciPy on the tails
+  - ours_mixed: FP32 betaincinv seed + one FP64 Halley step
+  - ours_cupy: cupyx.scipy.special.betaincinv on the GPU (incl. transfers)
+  - ours_numba: Numba prange kernel, Halley inversion of SciPy's Cephes betainc
+  - ours_mpmath: pure-Python mpmath fallback (root of betainc)
+  - ours_scipy_raw: two plain betaincinv calls (the kernel statsmodels wraps)
   - statsmodels.proportion_confint(method="jeffreys")
   - astropy.stats.binom_conf_interval(interval="jeffreys")
 
 Change LEVEL below to 0.68, 0.90, 0.95, 0.99, etc.
 """
 
+import contextlib
+import ctypes
+import math
+import multiprocessing
+import os
 import numpy as np
 import time
 import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+# Availability is decided once, here; lib_available only reads these flags
+try:
+    from scipy.special import betainc, betaincinv, betaln, ndtri
+    HAVE_SCIPY = True
+except ImportError:
+    HAVE_SCIPY = False
+
+try:
+    import mpmath as mp
+    HAVE_MPMATH = True
+except ImportError:
+    HAVE_MPMATH = False
+
+try:
+    from statsmodels.stats.proportion import proportion_confint
+    HAVE_STATSMODELS = True
+except ImportError:
+    HAVE_STATSMODELS = False
+
+try:
+    from astropy.stats import binom_conf_interval
+    HAVE_ASTROPY = True
+except ImportError:
+    HAVE_ASTROPY = False
+
+try:
+    import cupy as cp
+    from cupyx.scipy.special import betaincinv as cp_betaincinv
+    HAVE_CUPY = cp.cuda.runtime.getDeviceCount() > 0
+except Exception:  # not installed, or no usable CUDA driver / device
+    HAVE_CUPY = False
+
+try:
+    from numba import njit, prange
+    from numba.extending import get_cython_function_address
+except ImportError:
+    njit = None
 
 # -------- settings --------
 LEVEL = 0.95
 ALPHA = 1 - LEVEL
 SEED = 42
 SIZES = [1_000, 10_000, 100_000]  # vector sizes for timing
+VALIDATE_N = 10_000  # elements used for the accuracy check
+MPMATH_N = 20  # elements used for the (slow, pure-Python) mpmath fallback
+MPMATH_DPS = 15  # working precision; double-equivalent, lower only loses accuracy vs SciPy
+PARALLEL_BENCH = False  # time implementations concurrently in worker processes (shorter wall clock, but they contend for cores)
+MEMOIZE = False  # reuse (lo, hi) for repeated calls on the same arrays; off so timings stay cold
 RNG = np.random.default_rng(SEED)
+N_MAX_TRIALS = 2000  # n is drawn from [1, N_MAX_TRIALS)
 
 
 # -------- implementations --------
+_CI_CACHE = {}  # (id(y), id(n), alpha) -> (y, n, lo, hi), oldest first
+_CI_CACHE_MAX = 8  # entries pin their inputs alive, so keep only a few
+
+
 def jeffreys_ci_ours_scipy(y, n, alpha=ALPHA):
-    """Vectorized Jeffreys CI via SciPy's compiled inverse incomplete beta."""
-    from scipy.special import betaincinv
-    y = np.asarray(y, dtype=float)
-    n = np.asarray(n, dtype=float)
-    a = y + 0.5
-    b = n - y + 0.5
-    lo = betaincinv(a, b, alpha / 2.0)
-    hi = betaincinv(a, b, 1.0 - alpha / 2.0)
+    """Vectorized Jeffreys CI via SciPy's compiled inverse incomplete beta.
+
+    With MEMOIZE set, results are keyed on the identity of the input
+    arrays, so they must not be modified in place between calls. Cached
+    results are returned read-only.
+    """
+    y = np.asarray(y)
+    n = np.asarray(n)
+    if not MEMOIZE:
+        return _jeffreys_ci_scipy(y, n, alpha)
+    key = (id(y), id(n), alpha)
+    hit = _CI_CACHE.get(key)
+    # The entry holds y and n, so their ids can't be recycled while it
+    # exists; the identity check is belt and braces
+    if hit is None or hit[0] is not y or hit[1] is not n:
+        lo, hi = _jeffreys_ci_scipy(y, n, alpha)
+        lo.flags.writeable = False
+        hi.flags.writeable = False
+        if len(_CI_CACHE) >= _CI_CACHE_MAX:
+            del _CI_CACHE[next(iter(_CI_CACHE))]
+        hit = _CI_CACHE[key] = (y, n, lo, hi)
+    return hit[2], hit[3]
+
+
+def jeffreys_ci_ours_scipy_sorted(y, n, alpha=ALPHA):
+    """ours_scipy with the betaincinv queries sorted by min(a, b), then unsorted."""
+    return _jeffreys_ci_scipy(np.asarray(y), np.asarray(n), alpha, sort=True)
+
+
+def _jeffreys_ci_scipy(y, n, alpha, sort=False):
+    if not HAVE_SCIPY:
+        raise ImportError("scipy required")
+    shape = np.broadcast_shapes(y.shape, n.shape)
+    size = math.prod(shape)
+    q = alpha / 2.0
+    # One workspace of length 2N per argument, [lo queries | hi queries],
+    # filled in place so the only ufunc temporaries are the masks.
+    aa = np.empty(2 * size)
+    bb = np.empty(2 * size)
+    qq = np.full(2 * size, q)
+    a = aa[:size].reshape(shape)
+    b = bb[:size].reshape(shape)
+    np.add(y, 0.5, out=a)
+    np.subtract(n, y, out=b)
+    b += 0.5
+    # Upper bound by symmetry, I^-1(a, b, 1-q) = 1 - I^-1(b, a, q). The
+    # reflected root sits near 1 when hi is small (a < b), where 1 - x
+    # loses relative precision, so those elements keep the direct branch.
+    direct = a < b
+    ra = aa[size:].reshape(shape)
+    rb = bb[size:].reshape(shape)
+    np.copyto(ra, b)
+    np.copyto(ra, a, where=direct)
+    np.copyto(rb, a)
+    np.copyto(rb, b, where=direct)
+    np.copyto(qq[size:].reshape(shape), 1.0 - q, where=direct)
+    if sort:
+        # Neighbouring elements then take the same branches through incbi
+        order = np.argsort(np.minimum(aa, bb), kind="stable")
+        out = np.empty_like(qq)
+        out[order] = betaincinv(aa[order], bb[order], qq[order])
+    else:
+        out = betaincinv(aa, bb, qq, out=qq)
+    lo = out[:size].reshape(shape)
+    hi = out[size:].reshape(shape)
+    np.subtract(1.0, hi, out=hi, where=~direct)
     return lo, hi
 
 
+ASYMPTOTIC_MIN_AB = 12.0  # min(a, b) from which the asymptotic inversion is used
+
+
+def _eta_to_x(eta, mu, iters):
+    """Solve mu*ln(mu/x) + (1-mu)*ln((1-mu)/(1-x)) = eta^2/2, sign(x-mu) = sign(eta)."""
+    # Series start x = mu + s*eta - (2mu-1)*eta^2/3, then Newton (quadratic; 3 steps ~ 1e-13)
+    x = mu + eta * np.sqrt(mu * (1.0 - mu)) - (2.0 * mu - 1.0) * eta * eta / 3.0
+    x = np.clip(x, np.finfo(float).tiny, 1.0 - np.finfo(float).epsneg)
+    for _ in range(iters):
+        g = mu * np.log(mu / x) + (1.0 - mu) * np.log((1.0 - mu) / (1.0 - x)) - 0.5 * eta * eta
+        x = np.clip(x - g * x * (1.0 - x) / (x - mu), 1e-3 * x, 1.0 - 1e-3 * (1.0 - x))
+    return x
+
+
+def _betaincinv_asymptotic(a, b, p):
+    """Inverse regularized incomplete beta for large a+b (Temme 1992, first order).
+
+    With r = a+b and mu = a/r, I_x(a, b) ~ erfc(-eta*sqrt(r/2))/2 where eta
+    is the signed distance of x from mu defined by _eta_to_x. Start from
+    eta0 = ndtri(p)/sqrt(r), add the O(1/r) correction, map back to x and
+    polish with a single Halley step on betainc.
+    """
+    r = a + b
+    mu = a / r
+    eta0 = ndtri(p) / np.sqrt(r)
+    x0 = _eta_to_x(eta0, mu, 2)
+    eta = eta0 + np.log(eta0 * np.sqrt(mu * (1.0 - mu)) / (x0 - mu)) / (eta0 * r)
+    return _halley_step(a, b, p, _eta_to_x(eta, mu, 3))
+
+
+def _halley_step(a, b, p, x):
+    """One FP64 Halley step on betainc(a, b, x) - p (pdf from betaln)."""
+    a1 = a - 1.0
+    b1 = b - 1.0
+    err = betainc(a, b, x) - p
+    u = err / np.exp(a1 * np.log(x) + b1 * np.log1p(-x) - betaln(a, b))
+    return x - u / (1.0 - 0.5 * np.minimum(1.0, u * (a1 / x - b1 / (1.0 - x))))
+
+
+def _jeffreys_shapes(y, n):
+    """Beta shape parameters a = y + 0.5, b = n - y + 0.5 as float64."""
+    y = np.asarray(y)
+    # Integer counts promote inside the ufunc loop; no float copies of y, n
+    a = np.add(y, 0.5, dtype=np.float64)
+    b = np.subtract(n, y, dtype=np.float64)
+    b += 0.5
+    return a, b
+
+
+def _stack_queries(a, b, q):
+    """Broadcast a, b and stack [lo | hi] queries as in the SciPy path.
+
+    Returns the broadcast a, b (for the output shape) and length-2N aa, bb, qq.
+    """
+    a, b = np.broadcast_arrays(a, b)
+    aa = np.concatenate([a.ravel(), a.ravel()])
+    bb = np.concatenate([b.ravel(), b.ravel()])
+    qq = np.repeat([q, 1.0 - q], a.size)
+    return a, b, aa, bb, qq
+
+
+def jeffreys_ci_ours_asymptotic(y, n, alpha=ALPHA):
+    """Asymptotic inversion where min(a, b) >= ASYMPTOTIC_MIN_AB, SciPy elsewhere.
+
+    Accurate to ~1e-11 relative in the worst case (min(a, b) at the
+    threshold) and to rounding for large a, b.
+    """
+    if not HAVE_SCIPY:
+        raise ImportError("scipy required")
+    a, b = _jeffreys_shapes(y, n)
+    a, b, aa, bb, qq = _stack_queries(a, b, alpha / 2.0)
+    out = np.empty_like(aa)
+    hot = np.minimum(aa, bb) >= ASYMPTOTIC_MIN_AB
+    out[hot] = _betaincinv_asymptotic(aa[hot], bb[hot], qq[hot])
+    cold = ~hot
+    out[cold] = betaincinv(aa[cold], bb[cold], qq[cold])
+    return out[:a.size].reshape(a.shape), out[a.size:].reshape(a.shape)
+
+
+def jeffreys_ci_ours_mixed(y, n, alpha=ALPHA):
+    """FP32 betaincinv seed, then one FP64 Halley step.
+
+    The float32 loop is only good to ~2e-4 relative, so a single step
+    leaves ~1e-9; y = 0 / y = n bounds that underflow in FP32 take the
+    FP64 betaincinv instead.
+    """
+    if not HAVE_SCIPY:
+        raise ImportError("scipy required")
+    a, b = _jeffreys_shapes(y, n)
+    a, b, aa, bb, qq = _stack_queries(a, b, alpha / 2.0)
+    x = betaincinv(aa.astype(np.float32), bb.astype(np.float32), qq.astype(np.float32)).astype(np.float64)
+    out = np.empty_like(aa)
+    ok = (x > 0.0) & (x < 1.0)
+    out[ok] = _halley_step(aa[ok], bb[ok], qq[ok], x[ok])
+    bad = ~ok
+    out[bad] = betaincinv(aa[bad], bb[bad], qq[bad])
+    return out[:a.size].reshape(a.shape), out[a.size:].reshape(a.shape)
+
+
+def jeffreys_ci_ours_cupy(y, n, alpha=ALPHA):
+    """GPU Jeffreys CI; lo and hi run on separate streams. Host in, host out."""
+    if not HAVE_CUPY:
+        raise ImportError("cupy required")
+    y_d = cp.asarray(y)
+    a = y_d + 0.5
+    b = cp.asarray(n) - y_d + 0.5
+    # a, b are built on the null stream; the non-blocking streams don't
+    # synchronize with it implicitly, so make them wait on an event
+    ready = cp.cuda.Event()
+    ready.record()
+    s_lo = cp.cuda.Stream(non_blocking=True)
+    s_hi = cp.cuda.Stream(non_blocking=True)
+    s_lo.wait_event(ready)
+    s_hi.wait_event(ready)
+    with s_lo:
+        lo = cp_betaincinv(a, b, alpha / 2.0)
+    with s_hi:
+        hi = cp_betaincinv(a, b, 1.0 - alpha / 2.0)
+    s_lo.synchronize()
+    s_hi.synchronize()
+    return cp.asnumpy(lo), cp.asnumpy(hi)
+
+
+if njit is not None:
+    try:
+        # Fused variant 0 is the double-precision one (1 is float)
+        _betainc = ctypes.CFUNCTYPE(ctypes.c_double, ctypes.c_double, ctypes.c_double,
+                                    ctypes.c_double, ctypes.c_int)(
+            get_cython_function_address("scipy.special.cython_special", "__pyx_fuse_0betainc"))
+    except (ImportError, ValueError):
+        _betainc = None
+else:
+    _betainc = None
+HAVE_NUMBA = _betainc is not None
+
+if HAVE_NUMBA:
+    # No cache=True: kernels that call a ctypes pointer cannot be cached to disk
+    @njit
+    def _betaincinv_halley(a, b, p):
+        """Inverse regularized incomplete beta for a, b >= 0.5 and 0 < p < 1.
+
+        A&S 26.5.22 starting value, then safeguarded Halley steps on
+        betainc(a, b, x) - p (as in Numerical Recipes' invbetai).
+        """
+        a1 = a - 1.0
+        b1 = b - 1.0
+        if a >= 1.0 and b >= 1.0:
+            pp = p if p < 0.5 else 1.0 - p
+            t = math.sqrt(-2.0 * math.log(pp))
+            x = (2.30753 + t * 0.27061) / (1.0 + t * (0.99229 + t * 0.04481)) - t
+            if p < 0.5:
+                x = -x
+            al = (x * x - 3.0) / 6.0
+            h = 2.0 / (1.0 / (2.0 * a - 1.0) + 1.0 / (2.0 * b - 1.0))
+            w = (x * math.sqrt(al + h) / h
+                 - (1.0 / (2.0 * b - 1.0) - 1.0 / (2.0 * a - 1.0)) * (al + 5.0 / 6.0 - 2.0 / (3.0 * h)))
+            x = a / (a + b * math.exp(2.0 * w))
+        else:
+            lna = math.log(a / (a + b))
+            lnb = math.log(b / (a + b))
+            t = math.exp(a * lna) / a
+            u = math.exp(b * lnb) / b
+            w = t + u
+            if p < t / w:
+                x = (a * w * p) ** (1.0 / a)
+            else:
+                x = 1.0 - (b * w * (1.0 - p)) ** (1.0 / b)
+        lbeta = math.lgamma(a) + math.lgamma(b) - math.lgamma(a + b)
+        for _ in range(20):
+            if x <= 0.0 or x >= 1.0:
+                break
+            err = _betainc(a, b, x, 0) - p
+            # pdf at x; err / pdf is the Newton step, the bracket is Halley's correction
+            t = math.exp(a1 * math.log(x) + b1 * math.log1p(-x) - lbeta)
+            u = err / t
+            dx = u / (1.0 - 0.5 * min(1.0, u * (a1 / x - b1 / (1.0 - x))))
+            x -= dx
+            if x <= 0.0:
+                x = 0.5 * (x + dx)
+            if x >= 1.0:
+                x = 0.5 * (x + dx + 1.0)
+            if abs(dx) < 1e-15 * x:
+                break
+        return x
+
+    @njit(parallel=True)
+    def _jeffreys_ci_numba(y, n, q, lo, hi):
+        for i in prange(y.size):
+            a = y[i] + 0.5
+            b = n[i] - y[i] + 0.5
+            lo[i] = _betaincinv_halley(a, b, q)
+            # Same symmetry as the SciPy path: reflect only when hi is not small
+            if a < b:
+                hi[i] = _betaincinv_halley(a, b, 1.0 - q)
+            else:
+                hi[i] = 1.0 - _betaincinv_halley(b, a, q)
+
+
+def jeffreys_ci_ours_numba(y, n, alpha=ALPHA):
+    """Numba kernel calling Cephes betainc directly, one element per prange step."""
+    if not HAVE_NUMBA:
+        raise ImportError("numba (and scipy.special.cython_special) required")
+    y = np.asarray(y, dtype=np.float64)
+    n = np.asarray(n, dtype=np.float64)
+    shape = np.broadcast_shapes(y.shape, n.shape)
+    y = np.ascontiguousarray(np.broadcast_to(y, shape)).ravel()
+    n = np.ascontiguousarray(np.broadcast_to(n, shape)).ravel()
+    lo = np.empty(y.size)
+    hi = np.empty(y.size)
+    _jeffreys_ci_numba(y, n, alpha / 2.0, lo, hi)
+    return lo.reshape(shape), hi.reshape(shape)
+
+
 def jeffreys_ci_ours_mpmath(y, n, alpha=ALPHA):
-    """Pure-Python fallback using mpmath.betaincinv; fine for small vectors."""
-    import mpmath as mp
-    y = np.asarray(y, dtype=float)
-    n = np.asarray(n, dtype=float)
-    a = y + 0.5
-    b = n - y + 0.5
-    lo_q = alpha / 2.0
-    hi_q = 1.0 - alpha / 2.0
-    betainv = np.vectorize(lambda aa, bb, qq: float(mp.betaincinv(aa, bb, 0, qq)))
-    lo = betainv(a, b, lo_q)
-    hi = betainv(a, b, hi_q)
-    return lo, hi
+    """Pure-Python fallback using mpmath; fine for small vectors.
+
+    mpmath has no betaincinv, so each bound is a bracketed root of the
+    regularized betainc on (0, 1).
+    """
+    if not HAVE_MPMATH:
+        raise ImportError("mpmath required")
+    a, b = _jeffreys_shapes(y, n)
+    lo_q = mp.mpf(alpha / 2.0)
+    hi_q = mp.mpf(1.0 - alpha / 2.0)
+    bracket = (mp.mpf(0), mp.mpf(1))
+    mp_betainc, findroot = mp.betainc, mp.findroot
+
+    def betainv(aa, bb, qq):
+        f = lambda x: mp_betainc(aa, bb, 0, x, regularized=True) - qq
+        return float(findroot(f, bracket, solver="pegasus"))
+
+    # Plain loops over Python floats (np.vectorize is the same loop plus
+    # object boxing and ufunc dispatch); fromiter fills a preallocated array
+    a_l = a.ravel().tolist()
+    b_l = b.ravel().tolist()
+    with mp.workdps(MPMATH_DPS):
+        lo = np.fromiter((betainv(aa, bb, lo_q) for aa, bb in zip(a_l, b_l)),
+                         dtype=np.float64, count=a.size)
+        hi = np.fromiter((betainv(aa, bb, hi_q) for aa, bb in zip(a_l, b_l)),
+                         dtype=np.float64, count=a.size)
+    return lo.reshape(a.shape), hi.reshape(a.shape)
+
+
+def jeffreys_ci_ours_scipy_raw(y, n, alpha=ALPHA):
+    """The bare kernel statsmodels wraps: two betaincinv calls on a = y+0.5, b = n-y+0.5.
+
+    Baseline for the statsmodels row; the gap between the two is wrapper
+    overhead, not a different algorithm.
+    """
+    if not HAVE_SCIPY:
+        raise ImportError("scipy required")
+    a, b = _jeffreys_shapes(y, n)
+    return betaincinv(a, b, alpha / 2.0), betaincinv(a, b, 1.0 - alpha / 2.0)
 
 
 def jeffreys_ci_statsmodels(y, n, alpha=ALPHA):
-    """statsmodels wrapper (calls SciPy under the hood)."""
-    from statsmodels.stats.proportion import proportion_confint
+    """statsmodels wrapper (calls SciPy under the hood).
+
+    proportion_confint validates and broadcasts its inputs and goes
+    through scipy.stats.beta's generic ppf machinery before reaching
+    betaincinv, so its timing row measures that wrapper on top of the
+    ours_scipy_raw kernel.
+    """
+    if not HAVE_STATSMODELS:
+        raise ImportError("statsmodels required")
     lo, hi = proportion_confint(count=y, nobs=n, alpha=alpha, method="jeffreys")
     return np.asarray(lo), np.asarray(hi)
 
 
 def jeffreys_ci_astropy(y, n, alpha=ALPHA):
-    """Astropy implementation."""
-    from astropy.stats import binom_conf_interval
+    """Astropy implementation.
+
+    Follows Brown et al. (2001) at the edges, lo = 0 for y = 0 and hi = 1
+    for y = n, so its max|Δ| vs ours_scipy is the y = 0 / y = n bound;
+    interior elements agree exactly.
+    """
+    if not HAVE_ASTROPY:
+        raise ImportError("astropy required")
+    # Shape (2, ...): row 0 is the lower bound, row 1 the upper
     arr = binom_conf_interval(k=y, n=n, confidence_level=1 - alpha, interval="jeffreys")
-    lo = np.asarray(arr[:, 0])
-    hi = np.asarray(arr[:, 1])
+    lo, hi = np.asarray(arr[0]), np.asarray(arr[1])
     return lo, hi
 
 
 # -------- helpers --------
+_SAMPLE = None
+
+
+def sample_yn(N):
+    """First N of one shared (y, n) realization, n ~ U[1, N_MAX_TRIALS), y ~ U{0..n}.
+
+    Drawn once (at the largest size needed so far) so every N and both the
+    accuracy check and the benchmark see slices of the same data. y uses
+    floor(u*(n+1)) rather than RNG.integers with an array upper bound,
+    which goes through a per-element bounded sampler.
+    """
+    global _SAMPLE
+    if _SAMPLE is None or _SAMPLE[0].size < N:
+        size = max(N, *SIZES)
+        n = RNG.integers(1, N_MAX_TRIALS, size=size)
+        y = np.floor(RNG.random(size) * (n + 1)).astype(np.int64)
+        _SAMPLE = (y, n)
+    y, n = _SAMPLE
+    return y[:N], n[:N]
+
+
+_AVAILABLE = {
+    jeffreys_ci_ours_scipy: HAVE_SCIPY,
+    jeffreys_ci_ours_scipy_sorted: HAVE_SCIPY,
+    jeffreys_ci_ours_scipy_raw: HAVE_SCIPY,
+    jeffreys_ci_ours_asymptotic: HAVE_SCIPY,
+    jeffreys_ci_ours_mixed: HAVE_SCIPY,
+    jeffreys_ci_ours_cupy: HAVE_CUPY,
+    jeffreys_ci_ours_numba: HAVE_NUMBA,
+    jeffreys_ci_ours_mpmath: HAVE_MPMATH,
+    jeffreys_ci_statsmodels: HAVE_STATSMODELS,
+    jeffreys_ci_astropy: HAVE_ASTROPY,
+}
+
+
 def lib_available(fn) -> bool:
-    try:
-        fn(np.array([1]), np.array([10]), alpha=ALPHA)
-        return True
-    except Exception:
-        return False
+    return _AVAILABLE[fn]
 
 
 def time_call(fn, y, n, alpha, reps=5):
-    """Median runtime over 'reps' calls; includes a warmup."""
-    fn(y, n, alpha)  # warmup
-    dt = []
+    """Best (minimum) runtime in seconds over 'reps' calls, and the warmup call's result.
+
+    reps=1 times a single cold call and returns its result, with no warmup:
+    for slow pure-Python rows, where a warmup would only double the cost.
+    """
+    if reps == 1:
+        t0 = time.perf_counter_ns()
+        out = fn(y, n, alpha)
+        return (time.perf_counter_ns() - t0) * 1e-9, out
+    out = fn(y, n, alpha)  # warmup
+    best = math.inf
     for _ in range(reps):
-        t0 = time.perf_counter()
+        t0 = time.perf_counter_ns()
         fn(y, n, alpha)
-        dt.append(time.perf_counter() - t0)
-    return float(np.median(dt))
+        dt = time.perf_counter_ns() - t0
+        if dt < best:
+            best = dt
+    return best * 1e-9, out
+
+
+def _fmt(arr):
+    """Format a short float array for display (plain str.format, no ufuncs)."""
+    return "[" + ", ".join(f"{x:.6f}" for x in arr.tolist()) + "]"
+
+
+def _max_abs_diff(x, ref, scratch):
+    """max|x - ref| computed in place in (a prefix of) scratch."""
+    buf = scratch[:ref.size]
+    np.subtract(x, ref, out=buf)
+    np.abs(buf, out=buf)
+    return buf.max()
 
 
-def validate_against_scipy(N=10_000, alpha=ALPHA):
+def validate_against_scipy(y, n, alpha=ALPHA):
+    """Compare every implementation to ours_scipy on (y, n); returns (lo_ref, hi_ref)."""
     print("\n=== Accuracy check vs SciPy reference ===")
-    try:
-        import scipy  # noqa: F401
-    except Exception:
+    if not HAVE_SCIPY:
         print("SciPy not installed — cannot run accuracy comparison. Exiting.")
         sys.exit(1)
 
-    n = RNG.integers(1, 2000, size=N)
-    y = RNG.integers(0, n + 1, size=N)
-
+    N = y.size
     lo_ref, hi_ref = jeffreys_ci_ours_scipy(y, n, alpha=alpha)
+    scratch = np.empty(N)  # shared by every max|Δ| below
+
+    # our asymptotic fast path
+    lo_at, hi_at = jeffreys_ci_ours_asymptotic(y, n, alpha=alpha)
+    print(f"[ours_asym]   max|Δ| vs ours_scipy: "
+          f"lo={_max_abs_diff(lo_at, lo_ref, scratch):.2e}, "
+          f"hi={_max_abs_diff(hi_at, hi_ref, scratch):.2e}")
+
+    # our mixed-precision path
+    lo_mx, hi_mx = jeffreys_ci_ours_mixed(y, n, alpha=alpha)
+    print(f"[ours_mixed]  max|Δ| vs ours_scipy: "
+          f"lo={_max_abs_diff(lo_mx, lo_ref, scratch):.2e}, "
+          f"hi={_max_abs_diff(hi_mx, hi_ref, scratch):.2e}")
+
+    # our GPU path
+    if lib_available(jeffreys_ci_ours_cupy):
+        lo_cu, hi_cu = jeffreys_ci_ours_cupy(y, n, alpha=alpha)
+        print(f"[ours_cupy]   max|Δ| vs ours_scipy: "
+              f"lo={_max_abs_diff(lo_cu, lo_ref, scratch):.2e}, "
+              f"hi={_max_abs_diff(hi_cu, hi_ref, scratch):.2e}")
+    else:
+        print("[ours_cupy] not available; skipping accuracy check.")
+
+    # our numba kernel
+    if lib_available(jeffreys_ci_ours_numba):
+        lo_nb, hi_nb = jeffreys_ci_ours_numba(y, n, alpha=alpha)
+        print(f"[ours_numba]  max|Δ| vs ours_scipy: "
+              f"lo={_max_abs_diff(lo_nb, lo_ref, scratch):.2e}, "
+              f"hi={_max_abs_diff(hi_nb, hi_ref, scratch):.2e}")
+    else:
+        print("[ours_numba] not available; skipping accuracy check.")
 
     # our mpmath (sample only — slow)
-    try:
-        lo_m, hi_m = jeffreys_ci_ours_mpmath(y[:50], n[:50], alpha=alpha)
-        print(f"[ours_mpmath] max|Δ| vs ours_scipy (50 elems): "
-              f"lo={np.max(np.abs(lo_m - lo_ref[:50])):.2e}, "
-              f"hi={np.max(np.abs(hi_m - hi_ref[:50])):.2e}")
-    except Exception:
+    if lib_available(jeffreys_ci_ours_mpmath):
+        lo_m, hi_m = jeffreys_ci_ours_mpmath(y[:MPMATH_N], n[:MPMATH_N], alpha=alpha)
+        print(f"[ours_mpmath] max|Δ| vs ours_scipy ({MPMATH_N} elems): "
+              f"lo={_max_abs_diff(lo_m, lo_ref[:MPMATH_N], scratch):.2e}, "
+              f"hi={_max_abs_diff(hi_m, hi_ref[:MPMATH_N], scratch):.2e}")
+    else:
         print("[ours_mpmath] skipped (mpmath not installed).")
 
     # statsmodels
     if lib_available(jeffreys_ci_statsmodels):
         lo_sm, hi_sm = jeffreys_ci_statsmodels(y, n, alpha=alpha)
         print(f"[statsmodels] max|Δ| vs ours_scipy: "
-              f"lo={np.max(np.abs(lo_sm - lo_ref)):.2e}, "
-              f"hi={np.max(np.abs(hi_sm - hi_ref)):.2e}")
+              f"lo={_max_abs_diff(lo_sm, lo_ref, scratch):.2e}, "
+              f"hi={_max_abs_diff(hi_sm, hi_ref, scratch):.2e}")
     else:
         print("[statsmodels] not available; skipping accuracy check.")
 
@@ -121,8 +575,8 @@ def validate_against_scipy(N=10_000, alpha=ALPHA):
     if lib_available(jeffreys_ci_astropy):
         lo_as, hi_as = jeffreys_ci_astropy(y, n, alpha=alpha)
         print(f"[astropy]     max|Δ| vs ours_scipy: "
-              f"lo={np.max(np.abs(lo_as - lo_ref)):.2e}, "
-              f"hi={np.max(np.abs(hi_as - hi_ref)):.2e}")
+              f"lo={_max_abs_diff(lo_as, lo_ref, scratch):.2e}, "
+              f"hi={_max_abs_diff(hi_as, hi_ref, scratch):.2e}")
     else:
         print("[astropy] not available; skipping accuracy check.")
 
@@ -133,56 +587,123 @@ def validate_against_scipy(N=10_000, alpha=ALPHA):
     lo0, hi0 = jeffreys_ci_ours_scipy(edge_y0, edge_n, alpha=alpha)
     lon, hin = jeffreys_ci_ours_scipy(edge_yn, edge_n, alpha=alpha)
     print("\nEdge cases (y=0 and y=n), Jeffreys CI (level=%.3f):" % LEVEL)
-    print("  y=0 -> lo:", np.round(lo0, 6), " hi:", np.round(hi0, 6))
-    print("  y=n -> lo:", np.round(lon, 6), " hi:", np.round(hin, 6))
-
-
-def benchmark(alpha=ALPHA):
-    print("\n=== Benchmarks (median over 5 runs) ===")
-    for N in SIZES:
-        n = RNG.integers(1, 2000, size=N)
-        y = RNG.integers(0, n + 1, size=N)
-
-        # ours_scipy (reference)
-        try:
-            t_ours = time_call(jeffreys_ci_ours_scipy, y, n, alpha)
-            print(f"N={N:6d}  ours (SciPy betaincinv):        {1e3 * t_ours:8.3f} ms")
-        except Exception as e:
-            print(f"N={N:6d}  ours (SciPy): error -> {e}")
-
-        # statsmodels
-        if lib_available(jeffreys_ci_statsmodels):
-            t_sm = time_call(jeffreys_ci_statsmodels, y, n, alpha)
-            print(f"N={N:6d}  statsmodels.proportion_confint: {1e3 * t_sm:8.3f} ms")
-        else:
-            print(f"N={N:6d}  statsmodels: not available")
-
-        # astropy
-        if lib_available(jeffreys_ci_astropy):
-            t_as = time_call(jeffreys_ci_astropy, y, n, alpha)
-            print(f"N={N:6d}  astropy.binom_conf_interval:    {1e3 * t_as:8.3f} ms")
-        else:
-            print(f"N={N:6d}  astropy: not available")
-
-        # mpmath (only sensible to time at small N)
-        if N <= 1_000:
+    print(f"  y=0 -> lo: {_fmt(lo0)}  hi: {_fmt(hi0)}")
+    print(f"  y=n -> lo: {_fmt(lon)}  hi: {_fmt(hin)}")
+    return lo_ref, hi_ref
+
+
+# (short name, timing label, implementation, timed reps, sample size or None)
+_BENCH_IMPLS = [
+    ("ours (SciPy)", "ours (SciPy betaincinv):", jeffreys_ci_ours_scipy, 5, None),
+    ("ours (SciPy, sorted)", "ours (SciPy, sorted queries):", jeffreys_ci_ours_scipy_sorted, 5, None),
+    ("ours (asymptotic)", "ours (asymptotic + SciPy tails):", jeffreys_ci_ours_asymptotic, 5, None),
+    ("ours (mixed)", "ours (FP32 seed + FP64 Halley):", jeffreys_ci_ours_mixed, 5, None),
+    ("ours (CuPy)", "ours (CuPy betaincinv, GPU):", jeffreys_ci_ours_cupy, 5, None),
+    ("ours (Numba)", "ours (Numba Halley):", jeffreys_ci_ours_numba, 5, None),
+    ("ours (SciPy raw)", "ours (raw 2x betaincinv):", jeffreys_ci_ours_scipy_raw, 5, None),
+    ("statsmodels", "statsmodels.proportion_confint:", jeffreys_ci_statsmodels, 5, None),
+    ("astropy", "astropy.binom_conf_interval:", jeffreys_ci_astropy, 5, None),
+    # mpmath is only sensible to time on a small slice, once (at N <= 1000);
+    # reps=1 also skips the warmup call
+    ("ours (mpmath)", "ours (mpmath fallback):", jeffreys_ci_ours_mpmath, 1, MPMATH_N),
+]
+
+
+def _bench_line(idx, y, n, alpha, ref=None):
+    """Time one _BENCH_IMPLS entry on (y, n); returns the line to print (or None).
+
+    With ref = (lo_ref, hi_ref) for the same elements, the line also reports
+    the warmup result's max|Δ| against it.
+    """
+    name, label, fn, reps, sample = _BENCH_IMPLS[idx]
+    N = y.size
+    if sample is not None:
+        if N > 1_000:
+            return None
+        y, n = y[:sample], n[:sample]
+        if ref is not None:
+            ref = (ref[0][:sample], ref[1][:sample])
+    if not lib_available(fn):
+        return f"N={N:6d}  {name}: not available"
+    t, (lo, hi) = time_call(fn, y, n, alpha, reps=reps)
+    # Per-element time: across prefix sizes this separates per-call overhead
+    # from steady-state throughput
+    line = f"N={y.size:6d}  {label:<32} {1e3 * t:8.3f} ms  {1e9 * t / y.size:9.1f} ns/elem"
+    if ref is not None:
+        d = max(np.max(np.abs(lo - ref[0])), np.max(np.abs(hi - ref[1])))
+        line += f"   max|Δ| {d:.1e}"
+    return line
+
+
+def _bench_line_shm(idx, shm_name, N, alpha, ref):
+    """Worker entry point: (y, n) are read from a shared (2, N) int64 block."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        yn = np.ndarray((2, N), dtype=np.int64, buffer=shm.buf)
+        return _bench_line(idx, yn[0], yn[1], alpha, ref)
+    finally:
+        del yn
+        shm.close()
+
+
+def benchmark(y_all, n_all, alpha=ALPHA, ref=None):
+    """Time every implementation on the first N of (y_all, n_all) for N in SIZES.
+
+    ref = (lo_ref, hi_ref) from validate_against_scipy on a prefix of the
+    same data; sizes it covers report max|Δ| without another reference pass.
+    """
+    print("\n=== Benchmarks (best of 5 runs) ===")
+    if PARALLEL_BENCH:
+        # spawn, not fork: the parent has already initialised CUDA (HAVE_CUPY
+        # probes the device at import) and CUDA is unusable in a forked child
+        pool_cm = ProcessPoolExecutor(max_workers=min(len(_BENCH_IMPLS), os.cpu_count() or 1),
+                                      mp_context=multiprocessing.get_context("spawn"))
+    else:
+        pool_cm = contextlib.nullcontext()
+    with pool_cm as pool:
+        for N in SIZES:
+            y, n = y_all[:N], n_all[:N]
+            ref_N = None
+            if ref is not None and ref[0].size >= N:
+                ref_N = (ref[0][:N], ref[1][:N])
+
+            if pool is None:
+                for idx in range(len(_BENCH_IMPLS)):
+                    line = _bench_line(idx, y, n, alpha, ref_N)
+                    if line is not None:
+                        print(line)
+                continue
+
+            # One shared block per N, so workers don't each unpickle a copy of (y, n)
+            shm = shared_memory.SharedMemory(create=True, size=2 * N * 8)
             try:
-                t_mp = time_call(jeffreys_ci_ours_mpmath, y, n, alpha, reps=3)
-                print(f"N={N:6d}  ours (mpmath fallback):        {1e3 * t_mp:8.3f} ms")
-            except Exception:
-                print(f"N={N:6d}  ours (mpmath): not available")
+                yn = np.ndarray((2, N), dtype=np.int64, buffer=shm.buf)
+                yn[0] = y
+                yn[1] = n
+                del yn  # drop the export before close(), even if a row raises
+                futures = [pool.submit(_bench_line_shm, idx, shm.name, N, alpha, ref_N)
+                           for idx in range(len(_BENCH_IMPLS))]
+                for fut in as_completed(futures):
+                    line = fut.result()
+                    if line is not None:
+                        print(line)
+            finally:
+                shm.close()
+                shm.unlink()
 
 
 def main():
     print("Jeffreys CI benchmark | LEVEL=%.3f  (alpha=%.3f)" % (LEVEL, ALPHA))
+    # One (y, n) realization for both phases; validation uses a prefix of it
+    y, n = sample_yn(max(SIZES))
     # Accuracy checks (requires SciPy)
-    try:
-        import scipy  # noqa: F401
-        validate_against_scipy(N=10_000, alpha=ALPHA)
-    except Exception:
+    ref = None
+    if HAVE_SCIPY:
+        ref = validate_against_scipy(y[:VALIDATE_N], n[:VALIDATE_N], alpha=ALPHA)
+    else:
         print("\nSciPy is not installed; skipping accuracy checks.")
     # Benchmarks
-    benchmark(alpha=ALPHA)
+    benchmark(y, n, alpha=ALPHA, ref=ref)
 
 
 if __name__ == "__main__":